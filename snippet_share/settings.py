@@ -31,6 +31,11 @@ DEBUG = True
 
 ALLOWED_HOSTS = []
 
+# Pre-load URL resolvers, serializers, the password list and the snippet id
+# filter before serving traffic. DB connections are closed again afterwards,
+# since servers fork workers after this; each worker connects on first use.
+WARM_UP_ON_STARTUP = os.getenv('WARM_UP_ON_STARTUP', 'False') == 'True'
+
 
 # Application definition
 
@@ -92,9 +97,45 @@ CACHES = {
         "OPTIONS": {
             "MAX_ENTRIES": 1000
         }
+    },
+    # Rendered snippet HTML is keyed by content hash, so it lives outside
+    # the default cache that gets cleared on every write.
+    "highlight": {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": "django_cache/highlight/",
+        "TIMEOUT": None,
+        "OPTIONS": {
+            "MAX_ENTRIES": 5000
+        }
+    },
+    # Existence filter version and negative lookups, shared by all workers
+    "existence": {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": "django_cache/existence/",
+        "TIMEOUT": 60,
+        "OPTIONS": {
+            "MAX_ENTRIES": 10000
+        }
     }
 }
 
+# Syntax highlighting
+SNIPPET_HIGHLIGHTER = 'snippets.highlighting.PygmentsHighlighter'
+SNIPPET_HIGHLIGHT_CACHE = 'highlight'
+SNIPPET_HIGHLIGHT_POOL_THRESHOLD = 20000  # characters
+SNIPPET_HIGHLIGHT_WORKERS = 2
+SNIPPET_HIGHLIGHT_TIMEOUT = 2  # seconds
+SNIPPET_HIGHLIGHT_MAX_PENDING = 8
+
+# Snippet revisions: every Nth revision stores the full content
+SNIPPET_REVISION_SNAPSHOT_INTERVAL = 10
+
+# Snippet lookups: Bloom filter over ids plus a short-lived 404 cache
+SNIPPET_EXISTENCE_CACHE = 'existence'
+SNIPPET_EXISTENCE_FILTER_CAPACITY = 100000
+SNIPPET_EXISTENCE_POLL_INTERVAL = 1  # seconds
+SNIPPET_NEGATIVE_CACHE_TIMEOUT = 60  # seconds
+
 ROOT_URLCONF = 'snippet_share.urls'
 
 TEMPLATES = [
@@ -153,13 +194,17 @@ AUTH_PASSWORD_VALIDATORS = [
         'NAME': 'django.contrib.auth.password_validation.MinimumLengthValidator',
     },
     {
-        'NAME': 'django.contrib.auth.password_validation.CommonPasswordValidator',
+        'NAME': 'users.validators.CommonPasswordValidator',
     },
     {
         'NAME': 'django.contrib.auth.password_validation.NumericPasswordValidator',
     },
 ]
 
+# Password hashing runs in a process pool of this size (0 hashes inline)
+PASSWORD_HASHING_WORKERS = 2
+PASSWORD_HASHING_TIMEOUT = 10  # seconds
+
 
 # Internationalization
 # https://docs.djangoproject.com/en/5.2/topics/i18n/
@@ -1,5 +1,20 @@
 from django.apps import AppConfig
+from django.conf import settings
+from django.db.models.signals import post_delete, post_save
 
 class SnippetsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'snippets'
+
+    def ready(self):
+        from .existence import snippet_deleted, snippet_saved
+        from .models import Snippet
+
+        post_save.connect(snippet_saved, sender=Snippet, dispatch_uid='snippet_existence_saved')
+        post_delete.connect(snippet_deleted, sender=Snippet, dispatch_uid='snippet_existence_deleted')
+
+        if settings.WARM_UP_ON_STARTUP:
+            from .warmup import warm_up
+
+            # Servers fork workers after loading the app, so don't hand them open sockets
+            warm_up(keep_connections=False)
@@ -0,0 +1,194 @@
+import hashlib
+import math
+import os
+import threading
+import time
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Snippet
+
+VERSION_CACHE_KEY = 'snippet_existence_version'
+
+
+def get_existence_cache():
+    return caches[settings.SNIPPET_EXISTENCE_CACHE]
+
+
+class BloomFilter:
+    """
+    A fixed-size Bloom filter over byte strings.
+    Membership tests can return false positives but never false negatives.
+    """
+
+    def __init__(self, capacity, error_rate=0.01):
+        self.capacity = max(capacity, 1)
+        self.size = int(-self.capacity * math.log(error_rate) / math.log(2) ** 2) + 1
+        self.hash_count = max(1, round(self.size / self.capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+        # Salted so clients cannot craft ids that collide on purpose
+        self._salt = os.urandom(16)
+
+    def _positions(self, key):
+        digest = hashlib.blake2b(key, digest_size=16, key=self._salt).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hash_count)]
+
+    def add(self, key):
+        for position in self._positions(key):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, key):
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+
+class SnippetExistenceFilter:
+    """
+    Per-process Bloom filter over snippet ids.
+    It is built by the startup warm-up (or on first use) and extended in place
+    for snippets created in this process. Other processes announce their
+    creations by changing a shared version key. Hits poll that key at most
+    every SNIPPET_EXISTENCE_POLL_INTERVAL seconds; a miss always reads it
+    before rejecting, so an id another process just created is never denied.
+    """
+    # Rows created just before a refresh may commit after it,
+    # so incremental refreshes look back a little further.
+    REFRESH_OVERLAP = timedelta(minutes=5)
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._bloom = None
+        self._version = None
+        self._refreshed_at = None
+        self._polled_at = float('-inf')
+
+    def needs_rebuild(self):
+        return self._bloom is None or self._bloom.count >= self._bloom.capacity
+
+    def rebuild(self, only_if_needed=False):
+        with self._lock:
+            # Another thread may have rebuilt it while this one waited
+            if only_if_needed and not self.needs_rebuild():
+                return
+            version = get_existence_cache().get(VERSION_CACHE_KEY)
+            refreshed_at = timezone.now()
+            ids = list(Snippet.objects.values_list('id', flat=True))
+            bloom = BloomFilter(max(len(ids) * 2, settings.SNIPPET_EXISTENCE_FILTER_CAPACITY))
+            for pk in ids:
+                bloom.add(pk.bytes)
+            self._bloom, self._version, self._refreshed_at = bloom, version, refreshed_at
+            self._polled_at = time.monotonic()
+
+    def refresh(self, force=False):
+        if self.needs_rebuild():
+            self.rebuild(only_if_needed=True)
+            return
+
+        # Unless forced, the shared version is read at most once per poll interval
+        now = time.monotonic()
+        if not force and now - self._polled_at < settings.SNIPPET_EXISTENCE_POLL_INTERVAL:
+            return
+        self._polled_at = now
+
+        version = get_existence_cache().get(VERSION_CACHE_KEY)
+        if version == self._version:
+            return
+
+        with self._lock:
+            if version == self._version:
+                return
+            refreshed_at = timezone.now()
+            ids = Snippet.objects.filter(
+                created_at__gte=self._refreshed_at - self.REFRESH_OVERLAP
+            ).values_list('id', flat=True)
+            for pk in ids:
+                self._bloom.add(pk.bytes)
+            self._version, self._refreshed_at = version, refreshed_at
+
+    def might_exist(self, pk):
+        self.refresh()
+        if pk.bytes in self._bloom:
+            return True
+        # Not known here, but another process may have created it since the last poll
+        self.refresh(force=True)
+        return pk.bytes in self._bloom
+
+    def add(self, pk):
+        if self._bloom is not None:
+            self._bloom.add(pk.bytes)
+        # Only announce once the row is visible to the other processes
+        transaction.on_commit(self.announce)
+
+    def announce(self):
+        get_existence_cache().set(VERSION_CACHE_KEY, uuid.uuid4().hex, timeout=None)
+
+
+snippet_filter = SnippetExistenceFilter()
+
+
+def parse_snippet_id(value):
+    """Returns the snippet id as a UUID, or None if it cannot be one."""
+    if isinstance(value, uuid.UUID):
+        return value
+    try:
+        return uuid.UUID(str(value))
+    except ValueError:
+        return None
+
+
+def get_negative_cache_key(pk):
+    return f"snippet_not_found_{pk}"
+
+
+def get_remembered_snippet(pk):
+    """
+    Returns what is known about a snippet that recently answered with a 404:
+    None if nothing is cached, {'exists': False} if it does not exist, or the
+    fields the views use to decide visibility.
+    """
+    return get_existence_cache().get(get_negative_cache_key(pk))
+
+
+def remember_snippet(pk, snippet=None):
+    if snippet is None:
+        facts = (
+            Snippet.objects.filter(pk=pk)
+            .values('user_id', 'visibility', 'language', 'expires_at')
+            .first()
+        )
+    else:
+        facts = {
+            'user_id': snippet.user_id,
+            'visibility': snippet.visibility,
+            'language': snippet.language,
+            'expires_at': snippet.expires_at,
+        }
+    facts = {'exists': False} if facts is None else {'exists': True, **facts}
+    get_existence_cache().set(
+        get_negative_cache_key(pk), facts, timeout=settings.SNIPPET_NEGATIVE_CACHE_TIMEOUT
+    )
+
+
+def forget_snippet(pk):
+    get_existence_cache().delete(get_negative_cache_key(pk))
+
+
+def snippet_saved(sender, instance, created, **kwargs):
+    if created:
+        snippet_filter.add(instance.pk)
+    # Until the commit, other requests still read the old row and may cache it again
+    pk = instance.pk
+    transaction.on_commit(lambda: forget_snippet(pk))
+
+
+def snippet_deleted(sender, instance, **kwargs):
+    pk = instance.pk
+    transaction.on_commit(lambda: forget_snippet(pk))
@@ -0,0 +1,122 @@
+import hashlib
+import html
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.module_loading import import_string
+
+
+class BaseHighlighter:
+    """
+    Base class for snippet highlighters.
+    Bump `version` whenever the generated markup changes so stale
+    renders are no longer picked up from the cache.
+    """
+    name = 'base'
+    version = '1'
+
+    def render(self, content, language):
+        raise NotImplementedError
+
+
+class PlainTextHighlighter(BaseHighlighter):
+    name = 'plain'
+    version = '1'
+
+    def render(self, content, language):
+        return '<div class="highlight"><pre>%s</pre></div>' % html.escape(content)
+
+
+class PygmentsHighlighter(BaseHighlighter):
+    name = 'pygments'
+    version = '1'
+
+    # Snippet.LANGUAGE_CHOICES -> pygments lexer alias
+    LEXER_ALIASES = {
+        'django': 'html+django',
+        'plaintext': 'text',
+    }
+
+    def render(self, content, language):
+        from pygments import highlight
+        from pygments.formatters import HtmlFormatter
+        from pygments.lexers import get_lexer_by_name
+        from pygments.util import ClassNotFound
+
+        try:
+            lexer = get_lexer_by_name(self.LEXER_ALIASES.get(language, language))
+        except ClassNotFound:
+            lexer = get_lexer_by_name('text')
+        return highlight(content, lexer, HtmlFormatter())
+
+
+@lru_cache(maxsize=None)
+def get_highlighter():
+    return import_string(settings.SNIPPET_HIGHLIGHTER)()
+
+
+@lru_cache(maxsize=None)
+def get_render_pool():
+    return ThreadPoolExecutor(
+        max_workers=settings.SNIPPET_HIGHLIGHT_WORKERS,
+        thread_name_prefix='snippet-highlight',
+    )
+
+
+# Large renders queued or running in the pool, by cache key
+_pending_renders = {}
+_pending_renders_lock = threading.RLock()
+
+
+def get_render_cache_key(content, language, highlighter):
+    digest = hashlib.sha256(content.encode('utf-8')).hexdigest()
+    return f"snippet_html_{digest}_{language}_{highlighter.name}_{highlighter.version}"
+
+
+def render_snippet_html(snippet):
+    """
+    Returns the highlighted HTML for a snippet.
+    Renders are cached by content hash, language and highlighter version,
+    so each distinct body is only highlighted once. Large bodies are
+    rendered in a bounded pool and fall back to plain text on timeout;
+    the late result is still cached for the next request. Concurrent
+    requests for the same body share one pending render, and once
+    SNIPPET_HIGHLIGHT_MAX_PENDING renders are pending, new bodies get
+    plain text right away.
+    """
+    highlighter = get_highlighter()
+    render_cache = caches[settings.SNIPPET_HIGHLIGHT_CACHE]
+    cache_key = get_render_cache_key(snippet.content, snippet.language, highlighter)
+
+    rendered = render_cache.get(cache_key)
+    if rendered is not None:
+        return rendered
+
+    if len(snippet.content) < settings.SNIPPET_HIGHLIGHT_POOL_THRESHOLD:
+        rendered = highlighter.render(snippet.content, snippet.language)
+        render_cache.set(cache_key, rendered, timeout=None)
+        return rendered
+
+    def store_result(future):
+        if future.exception() is None:
+            render_cache.set(cache_key, future.result(), timeout=None)
+        with _pending_renders_lock:
+            _pending_renders.pop(cache_key, None)
+
+    with _pending_renders_lock:
+        future = _pending_renders.get(cache_key)
+        if future is None:
+            # Too much queued work already: serve plain text without adding more
+            if len(_pending_renders) >= settings.SNIPPET_HIGHLIGHT_MAX_PENDING:
+                return PlainTextHighlighter().render(snippet.content, snippet.language)
+            future = get_render_pool().submit(highlighter.render, snippet.content, snippet.language)
+            _pending_renders[cache_key] = future
+            future.add_done_callback(store_result)
+
+    try:
+        return future.result(timeout=settings.SNIPPET_HIGHLIGHT_TIMEOUT)
+    except TimeoutError:
+        return PlainTextHighlighter().render(snippet.content, snippet.language)
@@ -0,0 +1,92 @@
+import json
+import random
+import time
+import uuid
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test.utils import override_settings
+
+from snippets.models import Snippet, SnippetRevision
+from snippets.revisions import get_revision_content, record_revision
+
+
+class Command(BaseCommand):
+    help = (
+        "Compares storage size and fetch latency of snapshot+delta revisions against "
+        "full-copy versioning. Rows are written to the configured database inside a "
+        "transaction that is rolled back at the end."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lines', type=int, default=500, help="Lines in the initial snippet.")
+        parser.add_argument('--revisions', type=int, default=200, help="Number of edits to simulate.")
+        parser.add_argument('--edits', type=int, default=3, help="Lines changed per edit.")
+        parser.add_argument('--interval', type=int, default=settings.SNIPPET_REVISION_SNAPSHOT_INTERVAL)
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        versions = self.generate_versions(options)
+        interval = options['interval']
+
+        with transaction.atomic(), override_settings(SNIPPET_REVISION_SNAPSHOT_INTERVAL=interval):
+            user = User.objects.create(username=f"benchmark-{uuid.uuid4().hex[:12]}")
+            delta_snippet = Snippet.objects.create(user=user, title='delta', content=versions[0])
+            full_snippet = Snippet.objects.create(user=user, title='full copy', content=versions[0])
+
+            for content in versions:
+                delta_snippet.content = content
+                record_revision(delta_snippet)
+            SnippetRevision.objects.bulk_create(
+                SnippetRevision(snippet=full_snippet, number=number, is_snapshot=True, content=content)
+                for number, content in enumerate(versions, start=1)
+            )
+
+            delta_bytes = self.stored_bytes(delta_snippet)
+            full_bytes = self.stored_bytes(full_snippet)
+
+            start = time.perf_counter()
+            for number, content in enumerate(versions, start=1):
+                fetched = (
+                    SnippetRevision.objects.filter(snippet=full_snippet, number=number)
+                    .values_list('content', flat=True)
+                    .get()
+                )
+                assert fetched == content
+            full_fetch = (time.perf_counter() - start) / len(versions)
+
+            start = time.perf_counter()
+            for number, content in enumerate(versions, start=1):
+                assert get_revision_content(delta_snippet, number) == content
+            delta_fetch = (time.perf_counter() - start) / len(versions)
+
+            transaction.set_rollback(True)
+
+        self.stdout.write(f"revisions: {len(versions)}, snapshot interval: {interval}")
+        self.stdout.write(f"full copy:      {full_bytes:>12,} bytes  {full_fetch * 1e3:>8.2f} ms/fetch")
+        self.stdout.write(f"snapshot+delta: {delta_bytes:>12,} bytes  {delta_fetch * 1e3:>8.2f} ms/fetch")
+        self.stdout.write(self.style.SUCCESS(f"storage ratio: {delta_bytes / full_bytes:.3f}"))
+
+    def generate_versions(self, options):
+        rng = random.Random(options['seed'])
+        lines = [f"line_{i} = {rng.random()!r}\n" for i in range(options['lines'])]
+        versions = [''.join(lines)]
+        for _ in range(options['revisions'] - 1):
+            for _ in range(options['edits']):
+                position = rng.randrange(len(lines))
+                if rng.random() < 0.5:
+                    lines[position] = f"edited_{position} = {rng.random()!r}\n"
+                else:
+                    lines.insert(position, f"inserted = {rng.random()!r}\n")
+            versions.append(''.join(lines))
+        return versions
+
+    def stored_bytes(self, snippet):
+        total = 0
+        for content, delta in snippet.revisions.values_list('content', 'delta'):
+            total += len(content.encode('utf-8'))
+            if delta is not None:
+                total += len(json.dumps(delta).encode('utf-8'))
+        return total
@@ -0,0 +1,100 @@
+import json
+import re
+import uuid
+from datetime import timedelta
+
+from django.contrib.auth.models import AnonymousUser, User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Count
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from snippets.models import AccessLog, Snippet, SnippetRevision
+from snippets.views import SnippetSearchAPIView, SnippetViewSet
+
+
+class Command(BaseCommand):
+    help = (
+        "Runs EXPLAIN on the query behind each snippet endpoint and fails if any of them "
+        "falls back to a full table scan. Free-text search (?q=) is skipped, since "
+        "icontains cannot use a B-tree index. Run against a database with realistic "
+        "data and statistics, as planners may prefer scans on tiny tables."
+    )
+
+    def handle(self, *args, **options):
+        failures = []
+        for name, queryset in self.get_endpoint_queries():
+            plan = self.explain(queryset)
+            scans = find_full_scans(connection.vendor, plan)
+            if options['verbosity'] > 1:
+                self.stdout.write(f"{name}:\n{plan}\n")
+            if scans:
+                failures.append(name)
+                self.stdout.write(self.style.ERROR(f"FULL SCAN  {name}: {', '.join(scans)}"))
+            else:
+                self.stdout.write(self.style.SUCCESS(f"OK         {name}"))
+
+        if failures:
+            raise CommandError(f"{len(failures)} endpoint(s) fall back to a full scan.")
+
+    def get_endpoint_queries(self):
+        user = User(pk=1, username='explain')
+        snippet = Snippet(pk=uuid.uuid4(), user=user)
+
+        yield 'snippet-list (anonymous)', self.view_queryset(SnippetViewSet, 'list', AnonymousUser())
+        yield 'snippet-list (user)', self.view_queryset(SnippetViewSet, 'list', user)
+        yield 'snippet-list (user, language)', self.view_queryset(SnippetViewSet, 'list', user, language='python')
+        yield 'snippet-list (user, visibility)', self.view_queryset(SnippetViewSet, 'list', user, visibility='private')
+        yield 'snippets-search (language)', self.view_queryset(SnippetSearchAPIView, None, user, language='python')
+        yield 'snippets-search (visibility)', self.view_queryset(SnippetSearchAPIView, None, user, visibility='public')
+        yield 'snippet-detail', Snippet.objects.select_related('user').filter(pk=snippet.pk)
+        yield 'snippet-revisions', snippet.revisions.order_by('-number')
+        yield 'snippet-revision', SnippetRevision.objects.filter(snippet=snippet, number__lte=5, is_snapshot=True).order_by('-number')
+        yield 'snippet-analytics', (
+            AccessLog.objects.filter(snippet=snippet, accessed_at__gte=timezone.now() - timedelta(days=7))
+            .annotate(date=TruncDate('accessed_at'))
+            .values('date')
+            .annotate(views=Count('id'))
+            .order_by('date')
+        )
+
+    def view_queryset(self, view_class, action, user, **params):
+        request = Request(APIRequestFactory().get('/', params))
+        request.user = user
+        view = view_class(request=request, format_kwarg=None, kwargs={}, action=action)
+        return view.filter_queryset(view.get_queryset())
+
+    def explain(self, queryset):
+        if connection.vendor == 'mysql':
+            return queryset.explain(format='JSON')
+        return queryset.explain()
+
+
+def find_full_scans(vendor, plan):
+    """Returns the tables an EXPLAIN plan reads with a full table scan."""
+    if vendor == 'postgresql':
+        return re.findall(r'Seq Scan on (\w+)', plan)
+    if vendor == 'sqlite':
+        return [
+            table for table in re.findall(r'\bSCAN (\w+)\b(?! USING (?:COVERING )?INDEX)', plan)
+            if table != 'CONSTANT'
+        ]
+    if vendor == 'mysql':
+        scans = []
+
+        def walk(node):
+            if isinstance(node, dict):
+                if node.get('access_type') == 'ALL':
+                    scans.append(node.get('table_name', '?'))
+                for value in node.values():
+                    walk(value)
+            elif isinstance(node, list):
+                for value in node:
+                    walk(value)
+
+        walk(json.loads(plan))
+        return scans
+    raise CommandError(f"EXPLAIN parsing is not supported for the {vendor} backend.")
@@ -0,0 +1,138 @@
+import json
+import os
+import re
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+PROJECT_PACKAGES = ('snippet_share', 'snippets', 'users')
+
+# Runs in a fresh interpreter so nothing is already imported or cached.
+STARTUP_SCRIPT = """
+import importlib, importlib.util, json, os, sys, time
+sys.argv = json.loads(os.environ['PROFILE_STARTUP_ARGV'])
+timings = {}
+
+# -X importtime does not see importlib.import_module(), which Django uses for
+# settings, app modules, models and the URLconf, so time those calls here.
+dynamic_imports = []
+_import_module = importlib.import_module
+
+def import_module(name, package=None):
+    resolved = importlib.util.resolve_name(name, package)
+    if resolved in sys.modules:
+        return _import_module(name, package)
+    start = time.perf_counter()
+    module = _import_module(name, package)
+    dynamic_imports.append([resolved, int((time.perf_counter() - start) * 1e6)])
+    return module
+
+importlib.import_module = import_module
+
+start = time.perf_counter()
+import django
+django.setup()
+timings['setup'] = time.perf_counter() - start
+
+# Lets the test client's 'testserver' host through ALLOWED_HOSTS
+from django.test.utils import setup_test_environment
+setup_test_environment()
+
+if os.environ['PROFILE_STARTUP_WARM'] == '1':
+    from snippets.warmup import warm_up
+    start = time.perf_counter()
+    # Same call as SnippetsConfig.ready(), so this times what ships
+    timings.update({'warm_up.' + name: value for name, value in warm_up(keep_connections=False).items()})
+    timings['warm_up'] = time.perf_counter() - start
+
+from django.test import Client
+for phase in ('first_request', 'second_request'):
+    start = time.perf_counter()
+    response = Client().get('/api/')
+    timings[phase] = time.perf_counter() - start
+    if response.status_code != 200:
+        sys.exit(f"GET /api/ returned {response.status_code}")
+
+print(json.dumps({'timings': timings, 'dynamic_imports': dynamic_imports}))
+"""
+
+IMPORT_TIME_LINE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$')
+
+
+class Command(BaseCommand):
+    help = (
+        "Starts the project in a fresh interpreter and reports per-module import cost "
+        "(python -X importtime) and boot-to-first-response time, with and without the "
+        "startup warm-up from snippets.warmup."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limit', type=int, default=25, help="Number of modules to list.")
+        parser.add_argument('--all', action='store_true', help="List every module, not only project modules.")
+
+    def handle(self, *args, **options):
+        cold, import_times = self.run_startup(warm=False)
+        warm, _ = self.run_startup(warm=True)
+
+        modules = [
+            entry for entry in import_times
+            if options['all'] or entry['module'].split('.')[0] in PROJECT_PACKAGES
+        ]
+        modules.sort(key=lambda entry: entry['cumulative'], reverse=True)
+
+        self.stdout.write(f"{'cumulative ms':>14} {'self ms':>9}  module")
+        for entry in modules[:options['limit']]:
+            self_ms = '-' if entry['self'] is None else f"{entry['self'] / 1000:.1f}"
+            self.stdout.write(f"{entry['cumulative'] / 1000:>14.1f} {self_ms:>9}  {entry['module']}")
+
+        self.stdout.write("")
+        self.stdout.write(f"{'phase':<24} {'cold ms':>9} {'warm ms':>9}")
+        for phase in sorted(set(cold) | set(warm), key=lambda name: (name not in cold, name)):
+            cold_ms = f"{cold[phase] * 1000:.1f}" if phase in cold else '-'
+            warm_ms = f"{warm[phase] * 1000:.1f}" if phase in warm else '-'
+            self.stdout.write(f"{phase:<24} {cold_ms:>9} {warm_ms:>9}")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"boot to first response: {self.boot_time(cold) * 1000:.1f} ms cold, "
+            f"{self.boot_time(warm) * 1000:.1f} ms with warm-up"
+        ))
+
+    def boot_time(self, timings):
+        # Warm-up only pays off if it costs less than it saves on the first request
+        return timings['setup'] + timings.get('warm_up', 0) + timings['first_request']
+
+    def run_startup(self, warm):
+        env = {
+            **os.environ,
+            'DJANGO_SETTINGS_MODULE': settings.SETTINGS_MODULE,
+            'WARM_UP_ON_STARTUP': 'False',
+            # Same argv as this process, so settings resolve the same way
+            'PROFILE_STARTUP_ARGV': json.dumps(sys.argv),
+            'PROFILE_STARTUP_WARM': '1' if warm else '0',
+        }
+        result = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', STARTUP_SCRIPT],
+            cwd=settings.BASE_DIR, env=env, capture_output=True, text=True,
+        )
+        if result.returncode != 0:
+            raise CommandError(f"Startup failed:\n{result.stderr[-2000:]}")
+
+        import_times = []
+        for line in result.stderr.splitlines():
+            match = IMPORT_TIME_LINE.match(line)
+            if match:
+                import_times.append({
+                    'self': int(match.group(1)),
+                    'cumulative': int(match.group(2)),
+                    'module': match.group(4),
+                })
+        output = json.loads(result.stdout.splitlines()[-1])
+        seen = {entry['module'] for entry in import_times}
+        import_times.extend(
+            {'self': None, 'cumulative': cumulative, 'module': module}
+            for module, cumulative in output['dynamic_imports']
+            if module not in seen
+        )
+        return output['timings'], import_times
@@ -0,0 +1,64 @@
+# Generated by Django 5.2.6 on 2026-10-19 03:52
+
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Snippet',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('title', models.CharField(max_length=255)),
+                ('content', models.TextField()),
+                ('language', models.CharField(choices=[('python', 'Python'), ('javascript', 'JavaScript'), ('java', 'Java'), ('cpp', 'C++'), ('html', 'HTML'), ('css', 'CSS'), ('elixir', 'Elixir'), ('php', 'PHP'), ('django', 'Django Template'), ('plaintext', 'Plain Text')], default='plaintext', max_length=20)),
+                ('visibility', models.CharField(choices=[('public', 'Public'), ('private', 'Private'), ('unlisted', 'Unlisted')], default='public', max_length=10)),
+                ('expires_at', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='snippets', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'snippets',
+            },
+        ),
+        migrations.CreateModel(
+            name='AccessLog',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('ip_address', models.GenericIPAddressField()),
+                ('user_agent', models.TextField(blank=True)),
+                ('accessed_at', models.DateTimeField(auto_now_add=True)),
+                ('snippet', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='access_logs', to='snippets.snippet')),
+            ],
+            options={
+                'db_table': 'access_logs',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='snippet',
+            index=models.Index(fields=['user', 'visibility'], name='snippets_user_id_6e6e1f_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='snippet',
+            index=models.Index(fields=['created_at'], name='snippets_created_7687ee_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='snippet',
+            index=models.Index(fields=['expires_at'], name='snippets_expires_0453e1_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='accesslog',
+            index=models.Index(fields=['snippet', 'accessed_at'], name='access_logs_snippet_1ebcde_idx'),
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.6 on 2026-10-19 03:52
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('snippets', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SnippetRevision',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('number', models.PositiveIntegerField()),
+                ('is_snapshot', models.BooleanField(default=False)),
+                ('content', models.TextField(blank=True)),
+                ('delta', models.JSONField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('snippet', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='revisions', to='snippets.snippet')),
+            ],
+            options={
+                'db_table': 'snippet_revisions',
+                'constraints': [models.UniqueConstraint(fields=('snippet', 'number'), name='unique_snippet_revision_number')],
+            },
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.6 on 2026-10-19 03:52
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('snippets', '0002_snippetrevision'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='snippet',
+            name='snippets_user_id_6e6e1f_idx',
+        ),
+        migrations.AddIndex(
+            model_name='snippet',
+            index=models.Index(fields=['user', '-created_at'], name='snippets_user_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='snippet',
+            index=models.Index(fields=['user', 'visibility', '-created_at'], name='snippets_user_vis_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='snippet',
+            index=models.Index(fields=['visibility', '-created_at'], name='snippets_vis_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='snippet',
+            index=models.Index(fields=['language', '-created_at'], name='snippets_lang_created_idx'),
+        ),
+    ]
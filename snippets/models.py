@@ -36,7 +36,12 @@ class Snippet(models.Model):
     class Meta:
         db_table = 'snippets'
         indexes = [
-            models.Index(fields=['user', 'visibility']),
+            # Owner listing: user filter, newest first, optional visibility filter
+            models.Index(fields=['user', '-created_at'], name='snippets_user_created_idx'),
+            models.Index(fields=['user', 'visibility', '-created_at'], name='snippets_user_vis_created_idx'),
+            # Anonymous listing and search by visibility/language
+            models.Index(fields=['visibility', '-created_at'], name='snippets_vis_created_idx'),
+            models.Index(fields=['language', '-created_at'], name='snippets_lang_created_idx'),
             models.Index(fields=['created_at']),
             models.Index(fields=['expires_at']),
         ]
@@ -57,4 +62,23 @@ class AccessLog(models.Model):
         db_table = 'access_logs'
         indexes = [
             models.Index(fields=['snippet', 'accessed_at']),
-        ]
\ No newline at end of file
+        ]
+
+class SnippetRevision(models.Model):
+    """
+    A single version of a snippet's content.
+    Every SNIPPET_REVISION_SNAPSHOT_INTERVAL revisions store the full content,
+    the ones in between only store a line-based delta against the previous revision.
+    """
+    snippet = models.ForeignKey(Snippet, on_delete=models.CASCADE, related_name='revisions')
+    number = models.PositiveIntegerField()
+    is_snapshot = models.BooleanField(default=False)
+    content = models.TextField(blank=True)
+    delta = models.JSONField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'snippet_revisions'
+        constraints = [
+            models.UniqueConstraint(fields=['snippet', 'number'], name='unique_snippet_revision_number'),
+        ]
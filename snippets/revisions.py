@@ -0,0 +1,100 @@
+from difflib import SequenceMatcher
+
+from django.conf import settings
+
+from .models import Snippet, SnippetRevision
+
+
+def make_delta(old, new):
+    """
+    Returns the line-based delta turning `old` into `new` as a list of
+    [start, end, lines] hunks: old lines [start:end] are replaced by `lines`.
+    """
+    old_lines = old.splitlines(keepends=True)
+    new_lines = new.splitlines(keepends=True)
+    matcher = SequenceMatcher(None, old_lines, new_lines, autojunk=False)
+    return [
+        [i1, i2, new_lines[j1:j2]]
+        for tag, i1, i2, j1, j2 in matcher.get_opcodes()
+        if tag != 'equal'
+    ]
+
+
+def apply_delta(old, delta):
+    old_lines = old.splitlines(keepends=True)
+    lines = []
+    position = 0
+    for start, end, replacement in delta:
+        lines.extend(old_lines[position:start])
+        lines.extend(replacement)
+        position = end
+    lines.extend(old_lines[position:])
+    return ''.join(lines)
+
+
+def get_revision_content(snippet, number):
+    """
+    Rebuilds the content of a revision from the closest snapshot at or
+    before it, so at most SNIPPET_REVISION_SNAPSHOT_INTERVAL - 1 deltas are applied.
+    """
+    snapshot = (
+        snippet.revisions.filter(number__lte=number, is_snapshot=True)
+        .order_by('-number')
+        .first()
+    )
+    if snapshot is None:
+        raise SnippetRevision.DoesNotExist("Revision not found.")
+
+    content = snapshot.content
+    last_number = snapshot.number
+    deltas = (
+        snippet.revisions.filter(number__gt=snapshot.number, number__lte=number)
+        .order_by('number')
+        .values_list('number', 'delta')
+    )
+    for last_number, delta in deltas:
+        content = apply_delta(content, delta)
+
+    if last_number != number:
+        raise SnippetRevision.DoesNotExist("Revision not found.")
+    return content
+
+
+def lock_for_revision(snippet):
+    """
+    Locks the snippet row until the end of the transaction, so concurrent edits
+    number their revisions one after the other. Snippets without history yet
+    (created before revisions existed, or outside the API) first get their
+    stored content as revision 1, so the edit does not lose it.
+    Must be called inside a transaction, before the new content is saved.
+    """
+    stored = Snippet.objects.select_for_update().get(pk=snippet.pk)
+    if not stored.revisions.exists():
+        SnippetRevision.objects.create(
+            snippet=stored, number=1, is_snapshot=True, content=stored.content
+        )
+
+
+def record_revision(snippet):
+    """
+    Stores the current content of a snippet as its next revision.
+    Does nothing if the content did not change since the latest revision.
+    """
+    latest = snippet.revisions.order_by('-number').first()
+    if latest is None:
+        return SnippetRevision.objects.create(
+            snippet=snippet, number=1, is_snapshot=True, content=snippet.content
+        )
+
+    previous = get_revision_content(snippet, latest.number)
+    if previous == snippet.content:
+        return latest
+
+    number = latest.number + 1
+    if (number - 1) % settings.SNIPPET_REVISION_SNAPSHOT_INTERVAL == 0:
+        return SnippetRevision.objects.create(
+            snippet=snippet, number=number, is_snapshot=True, content=snippet.content
+        )
+    return SnippetRevision.objects.create(
+        snippet=snippet, number=number, delta=make_delta(previous, snippet.content)
+    )
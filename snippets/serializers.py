@@ -1,5 +1,5 @@
 from rest_framework import serializers
-from .models import Snippet, AccessLog
+from .models import Snippet, AccessLog, SnippetRevision
 from django.utils import timezone
 
 class AccessLogSerializer(serializers.ModelSerializer):
@@ -42,3 +42,8 @@ class SnippetListSerializer(serializers.ModelSerializer):
     
     def get_preview(self, obj):
         return obj.content[:100] + '...' if len(obj.content) > 100 else obj.content
+
+class SnippetRevisionSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = SnippetRevision
+        fields = ['number', 'is_snapshot', 'created_at']
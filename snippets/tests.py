@@ -1,10 +1,55 @@
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from io import StringIO
+from unittest import mock
+from django.core.cache import caches
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
 from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APITestCase
-from snippets.models import Snippet
+from snippets.models import Snippet, SnippetRevision
+from snippets.existence import BloomFilter, SnippetExistenceFilter, snippet_filter
+from snippets.highlighting import PygmentsHighlighter, _pending_renders, render_snippet_html
+from snippets.management.commands.check_query_plans import find_full_scans
+from snippets.warmup import WARM_UP_STEPS, warm_up
 from django.contrib.auth.models import User
 
 
+# Per-test caches, so the file-based ones are neither read nor cleared
+LOCMEM_CACHES = {
+    alias: {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': alias}
+    for alias in ('default', 'highlight', 'existence')
+}
+
+
+@contextmanager
+def slow_highlighter():
+    """
+    Patches the highlighter so renders block until the block exits.
+    Yields the mock and an event set once a render has started; on exit
+    it waits for the pending renders to finish, so none leak into the
+    next test.
+    """
+    started, released = threading.Event(), threading.Event()
+
+    def slow_render(content, language):
+        started.set()
+        released.wait()
+        return '<pre>slow</pre>'
+
+    with mock.patch.object(PygmentsHighlighter, 'render', side_effect=slow_render) as render:
+        try:
+            yield render, started
+        finally:
+            released.set()
+            while _pending_renders:
+                time.sleep(0.01)
+
+
 class SnippetCreationTests(APITestCase):
     def setUp(self):
         """
@@ -107,4 +152,252 @@ class SnippetAccessTests(APITestCase):
         detail_url = reverse('snippet-detail', kwargs={'pk': self.public_snippet_A.pk})
         response = self.client.delete(detail_url)
         self.assertIn(response.status_code, [status.HTTP_403_FORBIDDEN, status.HTTP_404_NOT_FOUND])
-        self.assertTrue(Snippet.objects.filter(pk=self.public_snippet_A.pk).exists())
\ No newline at end of file
+        self.assertTrue(Snippet.objects.filter(pk=self.public_snippet_A.pk).exists())
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class SnippetHighlightTests(APITestCase):
+    def setUp(self):
+        caches['highlight'].clear()
+        self.user = User.objects.create_user(username='testuser', password='testpassword')
+        self.snippet = Snippet.objects.create(
+            user=self.user, title='Hello', content='print("<hi>")', language='python', visibility='public')
+
+    def test_detail_returns_highlighted_html(self):
+        """Test ?format=html returns the rendered snippet body."""
+        detail_url = reverse('snippet-detail', kwargs={'pk': self.snippet.pk})
+        response = self.client.get(detail_url, {'format': 'html'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Content-Type'], 'text/html; charset=utf-8')
+        self.assertIn('class="highlight"', response.content.decode())
+        self.assertNotIn('<hi>', response.content.decode())
+
+    def test_render_is_cached_by_content(self):
+        """Test identical bodies are only highlighted once."""
+        other = Snippet.objects.create(
+            user=self.user, title='Copy', content=self.snippet.content, language='python')
+        with mock.patch.object(PygmentsHighlighter, 'render', return_value='<pre>x</pre>') as render:
+            self.assertEqual(render_snippet_html(self.snippet), '<pre>x</pre>')
+            self.assertEqual(render_snippet_html(other), '<pre>x</pre>')
+        self.assertEqual(render.call_count, 1)
+
+    @override_settings(SNIPPET_HIGHLIGHT_POOL_THRESHOLD=0, SNIPPET_HIGHLIGHT_TIMEOUT=0)
+    def test_slow_render_falls_back_to_plain_text(self):
+        """Test a render that exceeds the timeout falls back to escaped plain text."""
+        with slow_highlighter():
+            rendered = render_snippet_html(self.snippet)
+        self.assertEqual(rendered, '<div class="highlight"><pre>print(&quot;&lt;hi&gt;&quot;)</pre></div>')
+
+    def test_detail_view_returns_highlighted_html(self):
+        """Test ?format=html on /api/snippet/detail/<id>/ returns the rendered body."""
+        detail_url = reverse('snippet-detail', kwargs={'id': self.snippet.pk})
+        self.assertEqual(detail_url, f'/api/snippet/detail/{self.snippet.pk}/')
+        response = self.client.get(detail_url, {'format': 'html'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Content-Type'], 'text/html; charset=utf-8')
+        self.assertIn('class="highlight"', response.content.decode())
+
+    @override_settings(SNIPPET_HIGHLIGHT_POOL_THRESHOLD=0, SNIPPET_HIGHLIGHT_TIMEOUT=0)
+    def test_pending_render_is_shared(self):
+        """Test requests for a body that is still rendering do not submit it again."""
+        with slow_highlighter() as (render, started):
+            render_snippet_html(self.snippet)
+            started.wait()
+            render_snippet_html(self.snippet)
+        self.assertEqual(render.call_count, 1)
+
+    @override_settings(
+        SNIPPET_HIGHLIGHT_POOL_THRESHOLD=0, SNIPPET_HIGHLIGHT_TIMEOUT=0, SNIPPET_HIGHLIGHT_MAX_PENDING=1)
+    def test_full_backlog_falls_back_without_submitting(self):
+        """Test new bodies get plain text once too many renders are pending."""
+        other = Snippet.objects.create(user=self.user, title='Other', content='x = 1', language='python')
+        with slow_highlighter() as (render, started):
+            render_snippet_html(self.snippet)
+            started.wait()
+            rendered = render_snippet_html(other)
+        self.assertEqual(render.call_count, 1)
+        self.assertEqual(rendered, '<div class="highlight"><pre>x = 1</pre></div>')
+
+    def test_private_snippet_html_is_not_found(self):
+        """Test ?format=html does not leak another user's private snippet."""
+        other = User.objects.create_user(username='other', password='otherpassword')
+        private = Snippet.objects.create(user=other, title='Secret', content='x = 1', visibility='private')
+        detail_url = reverse('snippet-detail', kwargs={'pk': private.pk})
+        response = self.client.get(detail_url, {'format': 'html'})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+@override_settings(SNIPPET_REVISION_SNAPSHOT_INTERVAL=3)
+class SnippetRevisionTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpassword')
+        self.client.force_authenticate(user=self.user)
+        self.client.post(reverse('snippet-list'), {
+            'title': 'Versioned', 'content': 'a\nb\nc\n', 'language': 'python'}, format='json')
+        self.snippet = Snippet.objects.get()
+        self.versions = [self.snippet.content]
+
+    def edit(self, content):
+        detail_url = reverse('snippet-detail', kwargs={'pk': self.snippet.pk})
+        response = self.client.patch(detail_url, {'content': content}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.snippet.refresh_from_db()
+        self.versions.append(self.snippet.content)
+
+    def test_edits_store_snapshots_and_deltas(self):
+        """Test every SNIPPET_REVISION_SNAPSHOT_INTERVAL-th revision is a full snapshot."""
+        for content in ['a\nB\nc\n', 'a\nB\nc\nd\n', 'B\nc\nd\n', 'x\n']:
+            self.edit(content)
+        revisions = SnippetRevision.objects.filter(snippet=self.snippet).order_by('number')
+        self.assertEqual([r.is_snapshot for r in revisions], [True, False, False, True, False])
+        self.assertEqual(revisions[1].content, '')
+
+    def test_unchanged_content_does_not_create_revision(self):
+        """Test a title-only update does not add a revision."""
+        detail_url = reverse('snippet-detail', kwargs={'pk': self.snippet.pk})
+        self.client.patch(detail_url, {'title': 'Renamed'}, format='json')
+        self.assertEqual(SnippetRevision.objects.filter(snippet=self.snippet).count(), 1)
+
+    def test_fetch_any_revision(self):
+        """Test every revision can be fetched with its original content."""
+        for content in ['a\nB\nc', 'a\nB\nc\n\nd', 'z', 'B\nc\nd', 'a\nb\nc']:
+            self.edit(content)
+
+        response = self.client.get(reverse('snippet-revisions', kwargs={'pk': self.snippet.pk}))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['count'], len(self.versions))
+
+        for number, content in enumerate(self.versions, start=1):
+            url = reverse('snippet-revision', kwargs={'pk': self.snippet.pk, 'number': number})
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(response.data['content'], content)
+
+    def test_first_edit_keeps_content_of_snippet_without_history(self):
+        """Test a snippet created outside the API keeps its original content as revision 1."""
+        snippet = Snippet.objects.create(user=self.user, title='Old', content='x=1')
+        detail_url = reverse('snippet-detail', kwargs={'pk': snippet.pk})
+        self.client.patch(detail_url, {'content': 'y=2'}, format='json')
+
+        for number, content in [(1, 'x=1'), (2, 'y=2')]:
+            url = reverse('snippet-revision', kwargs={'pk': snippet.pk, 'number': number})
+            self.assertEqual(self.client.get(url).data['content'], content)
+
+    def test_benchmark_leaves_no_rows(self):
+        """Test benchmark_revisions runs against the database and rolls back."""
+        revisions = SnippetRevision.objects.count()
+        call_command('benchmark_revisions', '--lines', '20', '--revisions', '12', stdout=StringIO())
+        self.assertEqual(SnippetRevision.objects.count(), revisions)
+
+    def test_missing_revision_is_not_found(self):
+        url = reverse('snippet-revision', kwargs={'pk': self.snippet.pk, 'number': 2})
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_other_user_cannot_view_private_revisions(self):
+        """Test revisions of a private snippet are hidden from other users."""
+        self.snippet.visibility = 'private'
+        self.snippet.save()
+        self.client.force_authenticate(user=User.objects.create_user(username='other', password='otherpassword'))
+        response = self.client.get(reverse('snippet-revisions', kwargs={'pk': self.snippet.pk}))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class QueryPlanTests(TestCase):
+    def test_endpoint_queries_use_indexes(self):
+        """Test none of the endpoint queries fall back to a full table scan."""
+        call_command('check_query_plans', stdout=StringIO())
+
+    def test_full_scans_are_detected(self):
+        plan = Snippet.objects.filter(title='x').explain()
+        self.assertEqual(find_full_scans(connection.vendor, plan), ['snippets'])
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class SnippetExistenceTests(APITestCase):
+    def setUp(self):
+        self.user_a = User.objects.create_user(username='userA', password='passwordA')
+        self.user_b = User.objects.create_user(username='userB', password='passwordB')
+        self.private_snippet = Snippet.objects.create(
+            user=self.user_a, title='Private', content='secret', visibility='private')
+        snippet_filter.rebuild()
+
+    def test_bloom_filter_has_no_false_negatives(self):
+        bloom = BloomFilter(1000)
+        keys = [uuid.uuid4().bytes for _ in range(1000)]
+        for key in keys:
+            bloom.add(key)
+        self.assertTrue(all(key in bloom for key in keys))
+
+    @override_settings(SNIPPET_EXISTENCE_POLL_INTERVAL=60)
+    def test_snippet_created_by_another_worker_is_not_rejected(self):
+        """Test a miss checks the shared version even within the poll interval."""
+        worker, other_worker = SnippetExistenceFilter(), SnippetExistenceFilter()
+        worker.rebuild()
+        other_worker.rebuild()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            # bulk_create skips signals, so only other_worker hears about it
+            snippet, = Snippet.objects.bulk_create([Snippet(user=self.user_a, title='Other', content='x')])
+            other_worker.add(snippet.pk)
+        self.assertTrue(worker.might_exist(snippet.pk))
+
+        # Hits within the interval don't read the version at all
+        with mock.patch('snippets.existence.get_existence_cache') as get_existence_cache:
+            self.assertTrue(worker.might_exist(self.private_snippet.pk))
+        get_existence_cache.assert_not_called()
+
+    def test_unknown_id_is_rejected_without_query(self):
+        """Test a random UUID gets a 404 without touching the database."""
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse('snippet-detail', kwargs={'pk': uuid.uuid4()}))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse('snippet-detail', kwargs={'pk': 'not-a-uuid'}))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_repeated_private_probe_is_served_from_negative_cache(self):
+        """Test a second request for another user's private snippet does not query."""
+        detail_url = reverse('snippet-detail', kwargs={'pk': self.private_snippet.pk})
+        self.client.force_authenticate(user=self.user_b)
+        self.assertEqual(self.client.get(detail_url).status_code, status.HTTP_404_NOT_FOUND)
+        with self.assertNumQueries(0):
+            response = self.client.get(detail_url)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+        self.client.force_authenticate(user=self.user_a)
+        self.assertEqual(self.client.get(detail_url).status_code, status.HTTP_200_OK)
+
+    def test_update_invalidates_negative_cache(self):
+        """Test a snippet made public is visible right away."""
+        detail_url = reverse('snippet-detail', kwargs={'pk': self.private_snippet.pk})
+        self.assertEqual(self.client.get(detail_url).status_code, status.HTTP_404_NOT_FOUND)
+
+        self.private_snippet.visibility = 'public'
+        with self.captureOnCommitCallbacks(execute=True):
+            self.private_snippet.save()
+        self.assertEqual(self.client.get(detail_url).status_code, status.HTTP_200_OK)
+
+    def test_snippet_created_elsewhere_is_found_after_announce(self):
+        """Test ids created by another process are picked up once announced."""
+        # bulk_create skips signals, like an insert made by another worker
+        snippet, = Snippet.objects.bulk_create([Snippet(user=self.user_a, title='Other', content='x')])
+        detail_url = reverse('snippet-detail', kwargs={'pk': snippet.pk})
+        self.assertEqual(self.client.get(detail_url).status_code, status.HTTP_404_NOT_FOUND)
+
+        snippet_filter.announce()
+        self.assertEqual(self.client.get(detail_url).status_code, status.HTTP_200_OK)
+
+
+class WarmUpTests(TestCase):
+    def test_warm_up_runs_every_step(self):
+        timings = warm_up()
+        self.assertEqual(list(timings), [name for name, _ in WARM_UP_STEPS])
+        self.assertTrue(all(seconds >= 0 for seconds in timings.values()))
+
+    def test_warm_up_before_fork_closes_connections(self):
+        with mock.patch('snippets.warmup.connections.close_all') as close_all:
+            timings = warm_up(keep_connections=False)
+        self.assertNotIn('connections', timings)
+        self.assertIn('existence_filter', timings)
+        close_all.assert_called_once_with()
@@ -2,31 +2,74 @@ from rest_framework import viewsets, status, permissions, filters
 from rest_framework.decorators import action
 from rest_framework.generics import ListAPIView, RetrieveAPIView
 from rest_framework.response import Response
+from rest_framework.renderers import StaticHTMLRenderer
+from rest_framework.exceptions import NotFound
 from django.utils.decorators import method_decorator
 from django.views.decorators.vary import vary_on_cookie
 from django.db.models import Q, Count
+from django.db.models.functions import TruncDate
 from django.conf import settings
 from django.core.cache import cache
 from django.utils import timezone
-from django.db import DatabaseError
-from .models import Snippet, AccessLog
-from .serializers import SnippetSerializer, SnippetCreateSerializer, SnippetListSerializer
+from datetime import timedelta
+from django.db import DatabaseError, transaction
+from django.http import Http404
+from .models import Snippet, AccessLog, SnippetRevision
+from .serializers import SnippetSerializer, SnippetCreateSerializer, SnippetListSerializer, SnippetRevisionSerializer
 from .permissions import IsOwnerOrReadOnly
+from .highlighting import render_snippet_html
+from .revisions import get_revision_content, lock_for_revision, record_revision
+from .existence import snippet_filter, parse_snippet_id, get_remembered_snippet, remember_snippet
 from snippet_share.utils import get_client_ip
 
-class SnippetDetailView(RetrieveAPIView):
+class SnippetLookupMixin:
+    """
+    Rejects lookups for ids that cannot exist, or that recently answered
+    with a 404 for this kind of request, before they reach the database.
+    """
+
+    def get_snippet(self):
+        pk = parse_snippet_id(self.kwargs[self.lookup_url_kwarg or self.lookup_field])
+        if pk is None or not snippet_filter.might_exist(pk):
+            raise NotFound()
+
+        facts = get_remembered_snippet(pk)
+        if facts is not None and self.is_hidden(facts):
+            raise NotFound()
+
+        try:
+            snippet = self.get_object()
+        except Http404:
+            remember_snippet(pk)
+            raise
+
+        if snippet.visibility == 'private' and snippet.user != self.request.user:
+            remember_snippet(pk, snippet)
+            raise NotFound()
+
+        return snippet
+
+    def is_hidden(self, facts):
+        raise NotImplementedError
+
+class SnippetDetailView(SnippetLookupMixin, RetrieveAPIView):
     queryset = Snippet.objects.all()
     serializer_class = SnippetSerializer
     lookup_field = "id"
 
-    def get(self, request, *args, **kwargs):
-        snippet = self.get_object()
+    def get_renderers(self):
+        renderers = super().get_renderers()
+        # ?format=html returns the highlighted snippet body
+        renderers.append(StaticHTMLRenderer())
+        return renderers
 
-        if snippet.visibility == 'private' and snippet.user != request.user:
-            return Response(
-                {"detail": "Not found."},
-                status=status.HTTP_404_NOT_FOUND
-            )
+    def is_hidden(self, facts):
+        if not facts['exists']:
+            return True
+        return facts['visibility'] == 'private' and facts['user_id'] != self.request.user.pk
+
+    def get(self, request, *args, **kwargs):
+        snippet = self.get_snippet()
         
         try:
             log = AccessLog.objects.create(
@@ -37,6 +80,9 @@ class SnippetDetailView(RetrieveAPIView):
             cache.clear()
         except DatabaseError as e:
             print("Failed to create access log:", str(e))
+
+        if request.accepted_renderer.format == 'html':
+            return Response(render_snippet_html(snippet))
         
         return super().get(request, *args, **kwargs)
 
@@ -45,6 +91,7 @@ class SnippetSearchAPIView(ListAPIView):
     queryset = Snippet.objects.all()
     filter_backends = [filters.OrderingFilter]
     ordering_fields = ['created_at', 'title', 'access_log_count']
+    ordering = ['-created_at']
 
     def get_queryset(self):
         query = self.request.query_params.get("q", "")
@@ -75,7 +122,7 @@ class SnippetSearchAPIView(ListAPIView):
 
         return Response(data)
 
-class SnippetViewSet(viewsets.ModelViewSet):
+class SnippetViewSet(SnippetLookupMixin, viewsets.ModelViewSet):
     """
     A ViewSet for managing Snippets.
     """
@@ -83,6 +130,7 @@ class SnippetViewSet(viewsets.ModelViewSet):
     permission_classes = [permissions.IsAuthenticatedOrReadOnly, IsOwnerOrReadOnly]
     filter_backends = [filters.OrderingFilter]
     ordering_fields = ['created_at', 'title', 'access_log_count']
+    ordering = ['-created_at']
     
     def get_serializer_class(self):
         if self.action == 'create':
@@ -90,6 +138,13 @@ class SnippetViewSet(viewsets.ModelViewSet):
         elif self.action == 'list':
             return SnippetListSerializer
         return SnippetSerializer
+
+    def get_renderers(self):
+        renderers = super().get_renderers()
+        if self.action == 'retrieve':
+            # ?format=html returns the highlighted snippet body
+            renderers.append(StaticHTMLRenderer())
+        return renderers
     
     def get_queryset(self):
         """
@@ -147,17 +202,37 @@ class SnippetViewSet(viewsets.ModelViewSet):
         return response
     
     def perform_create(self, serializer):
-        serializer.save(user=self.request.user)
+        with transaction.atomic():
+            snippet = serializer.save(user=self.request.user)
+            record_revision(snippet)
         cache.clear()
+
+    def perform_update(self, serializer):
+        with transaction.atomic():
+            lock_for_revision(serializer.instance)
+            snippet = serializer.save()
+            record_revision(snippet)
     
+    def is_hidden(self, facts):
+        """Mirrors the filters of get_queryset() for a remembered 404."""
+        if not facts['exists']:
+            return True
+
+        language = self.request.query_params.get('language')
+        visibility = self.request.query_params.get('visibility')
+        if language and facts['language'] != language:
+            return True
+        if visibility and facts['visibility'] != visibility:
+            return True
+        if facts['expires_at'] and facts['expires_at'] <= timezone.now():
+            return True
+
+        if self.request.user.is_authenticated:
+            return facts['user_id'] != self.request.user.pk
+        return facts['visibility'] != 'public'
+
     def retrieve(self, request, *args, **kwargs):
-        snippet = self.get_object()
-        
-        if snippet.visibility == 'private' and snippet.user != request.user:
-            return Response(
-                {"detail": "Not found."},
-                status=status.HTTP_404_NOT_FOUND
-            )
+        snippet = self.get_snippet()
         
         try:
             log = AccessLog.objects.create(
@@ -168,9 +243,47 @@ class SnippetViewSet(viewsets.ModelViewSet):
             cache.clear()
         except DatabaseError as e:
             print("Failed to create access log:", str(e))
+
+        if request.accepted_renderer.format == 'html':
+            return Response(render_snippet_html(snippet))
         
         return super().retrieve(request, *args, **kwargs)
     
+    @action(detail=True, methods=['get'])
+    def revisions(self, request, pk=None):
+        """Endpoint to list the revisions of a snippet."""
+        snippet = self.get_object()
+
+        if snippet.visibility == 'private' and snippet.user != request.user:
+            raise NotFound()
+
+        revisions = snippet.revisions.order_by('-number')
+        page = self.paginate_queryset(revisions)
+        if page is not None:
+            serializer = SnippetRevisionSerializer(page, many=True)
+            return self.get_paginated_response(serializer.data)
+
+        serializer = SnippetRevisionSerializer(revisions, many=True)
+        return Response(serializer.data)
+
+    @action(detail=True, methods=['get'], url_path=r'revisions/(?P<number>\d+)')
+    def revision(self, request, pk=None, number=None):
+        """Endpoint to fetch the content of a snippet at a given revision."""
+        snippet = self.get_object()
+
+        if snippet.visibility == 'private' and snippet.user != request.user:
+            raise NotFound()
+
+        try:
+            content = get_revision_content(snippet, int(number))
+        except SnippetRevision.DoesNotExist:
+            raise NotFound()
+
+        return Response({
+            'number': int(number),
+            'content': content
+        })
+    
     @action(detail=True, methods=['get'])
     def analytics(self, request, pk=None):
         """Endpoint to get snippet analytics."""
@@ -185,10 +298,6 @@ class SnippetViewSet(viewsets.ModelViewSet):
         access_logs = snippet.access_logs.all()
         total_views = access_logs.count()
         
-        from django.db.models.functions import TruncDate
-        from django.db.models import Count
-        from datetime import timedelta
-        
         date_from = timezone.now() - timedelta(days=7)
         daily_views = (
             access_logs.filter(accessed_at__gte=date_from)
@@ -202,5 +311,3 @@ class SnippetViewSet(viewsets.ModelViewSet):
             'total_views': total_views,
             'daily_views': daily_views
         })
-
-print("ini test")
@@ -0,0 +1,91 @@
+import time
+import warnings
+
+from django.conf import settings
+from django.contrib import admin
+from django.db import DatabaseError, connections
+from django.urls import get_resolver
+
+
+def warm_up_urls():
+    # The URLconf builds admin.site.urls on import, and this may run before
+    # the admin app's own ready(), so register the admin modules first.
+    admin.autodiscover()
+    resolver = get_resolver()
+    # Importing the URLconf pulls in every view; populating compiles the patterns.
+    resolver.url_patterns
+    resolver._populate()
+
+
+def warm_up_serializers():
+    from .serializers import (
+        AccessLogSerializer, SnippetCreateSerializer, SnippetListSerializer,
+        SnippetRevisionSerializer, SnippetSerializer,
+    )
+    from users.serializers import RegisterSerializer, UserProfileSerializer
+
+    for serializer_class in (
+        SnippetSerializer, SnippetCreateSerializer, SnippetListSerializer,
+        SnippetRevisionSerializer, AccessLogSerializer, RegisterSerializer, UserProfileSerializer,
+    ):
+        serializer_class().fields
+
+
+def warm_up_passwords():
+    from users.validators import preload_common_passwords
+
+    preload_common_passwords()
+
+
+def warm_up_connections():
+    for alias in settings.DATABASES:
+        try:
+            connections[alias].ensure_connection()
+        except DatabaseError:
+            pass
+
+
+def warm_up_existence_filter():
+    from .existence import snippet_filter
+
+    try:
+        snippet_filter.rebuild()
+    except DatabaseError:
+        # e.g. before the first migrate; the filter then builds on first use
+        pass
+
+
+WARM_UP_STEPS = [
+    ('urls', warm_up_urls),
+    ('serializers', warm_up_serializers),
+    ('passwords', warm_up_passwords),
+    ('connections', warm_up_connections),
+    ('existence_filter', warm_up_existence_filter),
+]
+
+
+def warm_up(keep_connections=True):
+    """
+    Does the work a worker would otherwise do on its first requests.
+    Returns the time spent in each step, in seconds.
+
+    Pass keep_connections=False when the process may fork afterwards (e.g.
+    from AppConfig.ready() under a preforking server, or in a management
+    command): database connections are then closed at the end instead of
+    being held open and inherited by every child.
+    """
+    timings = {}
+    with warnings.catch_warnings():
+        # Run from AppConfig.ready(), the database access here is deliberate
+        warnings.filterwarnings(
+            'ignore', message='Accessing the database during app initialization', category=RuntimeWarning
+        )
+        for name, step in WARM_UP_STEPS:
+            if step is warm_up_connections and not keep_connections:
+                continue
+            start = time.perf_counter()
+            step()
+            timings[name] = time.perf_counter() - start
+    if not keep_connections:
+        connections.close_all()
+    return timings
@@ -0,0 +1,47 @@
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, TimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from functools import lru_cache
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+
+
+class PasswordHashingBusy(Exception):
+    """The hashing pool did not answer within PASSWORD_HASHING_TIMEOUT."""
+
+
+@lru_cache(maxsize=None)
+def get_hashing_pool():
+    # Spawned rather than forked: the web worker may already run threads.
+    return ProcessPoolExecutor(
+        max_workers=settings.PASSWORD_HASHING_WORKERS,
+        mp_context=multiprocessing.get_context('spawn'),
+    )
+
+
+def hash_password(raw_password):
+    """
+    Hashes a password in the bounded hashing pool, so concurrent signups
+    cannot run more than PASSWORD_HASHING_WORKERS key derivations at once.
+    A pool whose child died is replaced and the hash retried once, then the
+    password is hashed inline. If the pool does not answer within
+    PASSWORD_HASHING_TIMEOUT, PasswordHashingBusy is raised instead: hashing
+    inline then would undo the bound exactly when the pool is saturated.
+    """
+    if not settings.PASSWORD_HASHING_WORKERS:
+        return make_password(raw_password)
+
+    for _ in range(2):
+        pool = get_hashing_pool()
+        try:
+            future = pool.submit(make_password, raw_password)
+            return future.result(timeout=settings.PASSWORD_HASHING_TIMEOUT)
+        except BrokenProcessPool:
+            get_hashing_pool.cache_clear()
+            pool.shutdown(wait=False, cancel_futures=True)
+        except TimeoutError:
+            # Drops the task if it is still queued; a running one is left to finish
+            future.cancel()
+            raise PasswordHashingBusy
+    return make_password(raw_password)
@@ -0,0 +1,94 @@
+import csv
+import multiprocessing
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.contrib.auth.password_validation import validate_password
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+
+class Command(BaseCommand):
+    help = (
+        "Creates users in bulk from a CSV file with username,email,password columns. "
+        "Rows are validated like a signup, password hashing is spread over a process pool "
+        "and users are inserted in batches within one transaction."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('csv_file', help="CSV file with a header row, or '-' for stdin.")
+        parser.add_argument('--workers', type=int, default=os.cpu_count(), help="Hashing processes.")
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument('--skip-validation', action='store_true', help="Do not run AUTH_PASSWORD_VALIDATORS.")
+
+    def handle(self, *args, **options):
+        rows = self.read_rows(options['csv_file'])
+
+        existing = set(
+            User.objects.filter(username__in=[row['username'] for row in rows]).values_list('username', flat=True)
+        )
+        accepted = []
+        for row in rows:
+            if row['username'] in existing:
+                self.stderr.write(f"{row['username']}: already exists, skipped")
+                continue
+            user = User(username=row['username'], email=row['email'])
+            errors = []
+            try:
+                # Uniqueness is covered by the `existing` set, without a query per row
+                user.full_clean(exclude=['password'], validate_unique=False, validate_constraints=False)
+            except ValidationError as e:
+                errors.extend(f"{field}: {' '.join(messages)}" for field, messages in e.message_dict.items())
+            if not options['skip_validation']:
+                try:
+                    validate_password(row['password'], user)
+                except ValidationError as e:
+                    errors.append(f"password: {' '.join(e.messages)}")
+            if errors:
+                self.stderr.write(f"{row['username']}: {'; '.join(errors)}")
+                continue
+            existing.add(row['username'])
+            accepted.append(row)
+
+        passwords = [row['password'] for row in accepted]
+        if options['workers'] > 1 and len(passwords) > 1:
+            chunksize = max(1, len(passwords) // (options['workers'] * 4))
+            # Spawned, so the children don't inherit this process's DB connection
+            with ProcessPoolExecutor(
+                max_workers=options['workers'], mp_context=multiprocessing.get_context('spawn')
+            ) as pool:
+                hashes = list(pool.map(make_password, passwords, chunksize=chunksize))
+        else:
+            hashes = [make_password(password) for password in passwords]
+
+        users = [
+            User(username=row['username'], email=row['email'], password=password_hash)
+            for row, password_hash in zip(accepted, hashes)
+        ]
+        # All or nothing: a failed batch must not leave earlier batches behind
+        with transaction.atomic():
+            User.objects.bulk_create(users, batch_size=options['batch_size'])
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Created {len(users)} user(s), skipped {len(rows) - len(users)}."
+        ))
+
+    def read_rows(self, path):
+        if path == '-':
+            return self.parse_rows(sys.stdin)
+        try:
+            with open(path, newline='', encoding='utf-8') as f:
+                return self.parse_rows(f)
+        except OSError as e:
+            raise CommandError(str(e))
+
+    def parse_rows(self, f):
+        reader = csv.DictReader(f)
+        missing = {'username', 'email', 'password'} - set(reader.fieldnames or [])
+        if missing:
+            raise CommandError(f"Missing column(s): {', '.join(sorted(missing))}")
+        return list(reader)
@@ -1,3 +1,111 @@
-from django.test import TestCase
+import os
+import tempfile
+import time
+from io import StringIO
 
-# Create your tests here.
+from django.contrib.auth.hashers import check_password
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from .hashing import get_hashing_pool, hash_password
+
+
+class RegisterTests(APITestCase):
+    def setUp(self):
+        self.register_url = reverse('register')
+
+    def register(self, password):
+        return self.client.post(self.register_url, {
+            'username': 'newuser',
+            'email': 'new@example.com',
+            'password': password,
+            'password2': password,
+        }, format='json')
+
+    def test_register_creates_user_with_single_insert(self):
+        """Test registration hashes the password in the pool and inserts the user once."""
+        with CaptureQueriesContext(connection) as queries:
+            response = self.register('x7!kQ9#pLm2v')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        statements = [query['sql'].split()[0] for query in queries]
+        self.assertEqual(statements.count('INSERT'), 1)
+        self.assertEqual(statements.count('UPDATE'), 0)
+        self.assertTrue(User.objects.get(username='newuser').check_password('x7!kQ9#pLm2v'))
+
+    @override_settings(PASSWORD_HASHING_WORKERS=0)
+    def test_common_password_is_rejected(self):
+        response = self.register('password123')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('password', response.data)
+        self.assertFalse(User.objects.exists())
+
+
+class HashPasswordTests(TestCase):
+    def tearDown(self):
+        get_hashing_pool().shutdown()
+        get_hashing_pool.cache_clear()
+
+    @override_settings(PASSWORD_HASHING_WORKERS=1)
+    def test_broken_pool_is_replaced(self):
+        get_hashing_pool.cache_clear()
+        pool = get_hashing_pool()
+        pool.submit(os.getpid).result()
+        for process in list(pool._processes.values()):
+            process.kill()
+            process.join()
+
+        password_hash = hash_password('x7!kQ9#pLm2v')
+
+        self.assertTrue(check_password('x7!kQ9#pLm2v', password_hash))
+        self.assertIsNot(get_hashing_pool(), pool)
+
+    @override_settings(PASSWORD_HASHING_WORKERS=1, PASSWORD_HASHING_TIMEOUT=0)
+    def test_saturated_pool_asks_signups_to_retry(self):
+        """Test a signup that cannot get a hashing slot gets a 503 instead of hashing inline."""
+        get_hashing_pool.cache_clear()
+        get_hashing_pool().submit(time.sleep, 1)
+        response = self.client.post(reverse('register'), {
+            'username': 'newuser',
+            'email': 'new@example.com',
+            'password': 'x7!kQ9#pLm2v',
+            'password2': 'x7!kQ9#pLm2v',
+        }, content_type='application/json')
+        self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertIn('Retry-After', response.headers)
+        self.assertFalse(User.objects.exists())
+
+
+class ProvisionUsersTests(TestCase):
+    def provision(self, content, *args):
+        with tempfile.NamedTemporaryFile('w', suffix='.csv', delete=False) as f:
+            f.write(content)
+        self.addCleanup(os.remove, f.name)
+        stderr = StringIO()
+        call_command('provision_users', f.name, *args, stdout=StringIO(), stderr=stderr)
+        return stderr.getvalue()
+
+    def test_provisions_valid_users(self):
+        User.objects.create_user(username='taken', password='x7!kQ9#pLm2v')
+        errors = self.provision(
+            "username,email,password\n"
+            "alice,alice@example.com,x7!kQ9#pLm2v\n"
+            "bob,bob@example.com,Tr0ub4dor&3-horse\n"
+            "carol,carol@example.com,password\n"
+            "taken,taken@example.com,x7!kQ9#pLm2v\n"
+            "dave,not-an-email,x7!kQ9#pLm2v\n"
+            "erin smith,erin@example.com,123\n",
+            '--workers', '2',
+        )
+        self.assertIn('carol: password:', errors)
+        self.assertIn('taken', errors)
+        self.assertIn('dave: email:', errors)
+        self.assertRegex(errors, r'erin smith: username: .*; password: ')
+        self.assertEqual(set(User.objects.values_list('username', flat=True)), {'alice', 'bob', 'taken'})
+        self.assertTrue(User.objects.get(username='bob').check_password('Tr0ub4dor&3-horse'))
@@ -0,0 +1,35 @@
+import gzip
+from functools import lru_cache
+
+from django.contrib.auth import password_validation
+
+
+@lru_cache(maxsize=None)
+def load_common_passwords(path):
+    """Loads a (optionally gzipped) password list once per process as a frozenset."""
+    try:
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            return frozenset(x.strip() for x in f)
+    except OSError:
+        with open(path) as f:
+            return frozenset(x.strip() for x in f)
+
+
+class CommonPasswordValidator(password_validation.CommonPasswordValidator):
+    """
+    Same check as Django's CommonPasswordValidator, but every instance shares
+    one preloaded frozenset instead of reading the list on construction.
+    """
+
+    def __init__(self, password_list_path=None):
+        self.password_list_path = password_list_path or self.DEFAULT_PASSWORD_LIST_PATH
+
+    @property
+    def passwords(self):
+        return load_common_passwords(self.password_list_path)
+
+
+def preload_common_passwords():
+    for validator in password_validation.get_default_password_validators():
+        if isinstance(validator, CommonPasswordValidator):
+            load_common_passwords(validator.password_list_path)
@@ -1,6 +1,7 @@
 from rest_framework import generics
 from rest_framework.response import Response
 from rest_framework import status
+from .hashing import PasswordHashingBusy
 from .serializers import RegisterSerializer, UserProfileSerializer
 from rest_framework.views import APIView
 from rest_framework.permissions import IsAuthenticated
@@ -11,7 +12,14 @@ class RegisterView(generics.CreateAPIView):
     def post(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
-        serializer.save()
+        try:
+            serializer.save()
+        except PasswordHashingBusy:
+            return Response(
+                {"detail": "Too many signups right now, please try again shortly."},
+                status=status.HTTP_503_SERVICE_UNAVAILABLE,
+                headers={"Retry-After": "5"},
+            )
         return Response({"message": "User registered successfully"}, status=status.HTTP_201_CREATED)
 
 class UserProfileView(APIView):